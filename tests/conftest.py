@@ -0,0 +1,118 @@
+# coding: utf8
+
+import io
+
+import pytest
+import requests
+
+from vgmusic import vgmusic
+
+SYSTEM_URL = "https://vgmusic.com/music/console/nintendo/nes/"
+
+# a cut-down system page, laid out like the ones on VGMusic.
+SYSTEM_PAGE = b"""\
+<html>
+<head><title>NES</title></head>
+<body>
+<p class="menularge">Nintendo</p>
+<table width="100%">
+<tr><th>Song Title</th><th>File Size</th><th>Sequenced By</th><th>Comments</th></tr>
+<tr><td colspan="4">&nbsp;</td></tr>
+<tr class="header"><td class="header" colspan="4"><a name="Castlevania">Castlevania</a></td></tr>
+<tr><td><a href="Vampire_Killer.mid">Vampire Killer</a></td><td>8121 bytes</td><td>John Doe</td><td><a href="../../../../file/0123456789abcdef0123456789abcdef.html">Info</a></td></tr>
+<tr><td><a href="../shared/Stalker.mid">Stalker</a></td><td>5032 bytes</td><td> Jane Roe </td><td><a href="../../../../file/fedcba9876543210fedcba9876543210.html">Info</a></td></tr>
+<tr><td colspan="4">&nbsp;</td></tr>
+<tr class="header"><td class="header" colspan="4"><a name="Mega Man 2">Mega Man 2</a></td></tr>
+<tr><td><a href="Dr_Wily_Stage_1.mid">Dr. Wily Stage 1 &amp; 2</a></td><td>12000 bytes</td><td>John Doe</td><td><a href="../../../../file/00112233445566778899aabbccddeeff.html">Info</a></td></tr>
+<tr><td colspan="4">&nbsp;</td></tr>
+</table>
+<hr>
+<address>Page generated by VGMIndex 4.0.3.</address>
+</body>
+</html>
+"""
+
+# the same songs as SYSTEM_PAGE, as serialised by Song.cache().
+SYSTEM_SONGS = {
+    "Castlevania": [
+        {
+            "url": SYSTEM_URL + "Vampire_Killer.mid",
+            "title": "Vampire Killer",
+            "size": 8121,
+            "author": "John Doe",
+            "md5": "0123456789abcdef0123456789abcdef",
+        },
+        {
+            "url": "https://vgmusic.com/music/console/nintendo/shared/Stalker.mid",
+            "title": "Stalker",
+            "size": 5032,
+            "author": "Jane Roe",
+            "md5": "fedcba9876543210fedcba9876543210",
+        },
+    ],
+    "Mega Man 2": [
+        {
+            "url": SYSTEM_URL + "Dr_Wily_Stage_1.mid",
+            "title": "Dr. Wily Stage 1 & 2",
+            "size": 12000,
+            "author": "John Doe",
+            "md5": "00112233445566778899aabbccddeeff",
+        },
+    ],
+}
+
+PARSERS = ["lxml"]
+if vgmusic.html5_parser is not None or vgmusic.html5lib is not None:
+    PARSERS.append("html5lib")
+
+
+class Session:
+    """Stands in for requests.Session, serving pages from memory instead of downloading them.
+
+    Args:
+        pages: A map of urls to (status_code, content) or (status_code, content, headers).
+
+    Attributes:
+        pages: See args.
+        requests: The (url, headers) of every request made so far.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def get(self, url, headers=None, stream=False):
+        self.requests.append((url, headers or {}))
+        status_code, content, *headers = self.pages[url]
+
+        resp = requests.Response()
+        resp.url = url
+        resp.status_code = status_code
+        resp.encoding = "utf-8"
+        resp.headers.update(*headers)
+        resp.raw = io.BytesIO(content)
+
+        return resp
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(params=PARSERS)
+def parser(request):
+    return request.param
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    """A cache file (in the current format) with the songs of SYSTEM_PAGE as the NES."""
+
+    path = tmp_path / "cache.json"
+    system = {"url": SYSTEM_URL, "version": "4.0.3", "games": SYSTEM_SONGS}
+
+    with vgmusic.API(
+        cache={"urls": {"NES": SYSTEM_URL}, "systems": {"NES": system}}
+    ) as api:
+        api.save_cache(path, indent=False)
+
+    return path
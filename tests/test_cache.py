@@ -0,0 +1,106 @@
+# coding: utf8
+
+import pytest
+
+from vgmusic import vgmusic
+
+from conftest import SYSTEM_SONGS, SYSTEM_URL
+
+# a cache from an older version: a list of song dicts for each game, and no etag or content hash.
+OLD_CACHE = {
+    "urls": {"NES": SYSTEM_URL},
+    "systems": {
+        "NES": {
+            "url": SYSTEM_URL,
+            "version": "4.0.3",
+            "games": SYSTEM_SONGS,
+        }
+    },
+}
+
+
+def _songs(api):
+    return {
+        name: {game: [song.cache() for song in songs] for game, songs in system.items()}
+        for name, system in api.items()
+    }
+
+
+def test_old_cache_round_trip(tmp_path):
+    path = tmp_path / "cache.json"
+
+    with vgmusic.API(cache=OLD_CACHE) as api:
+        # it has to be saved again in the new format.
+        assert api.modified
+        assert _songs(api) == {"NES": SYSTEM_SONGS}
+        api.save_cache(path)
+
+    cache = vgmusic.load_cache(path)
+    system = cache["systems"]["NES"]
+    assert system["etag"] is None
+    assert system["content_hash"] is None
+    assert system["games"]["Castlevania"] == {
+        field: [song[field] for song in SYSTEM_SONGS["Castlevania"]]
+        for field in vgmusic.Song.__slots__
+    }
+
+    with vgmusic.API.load_cache(path) as api:
+        assert not api.modified
+        assert _songs(api) == {"NES": SYSTEM_SONGS}
+
+
+def test_cache_columns_unchanged(tmp_path):
+    path = tmp_path / "cache.json"
+
+    with vgmusic.API(cache=OLD_CACHE) as api:
+        api.save_cache(path)
+    cache = vgmusic.load_cache(path)
+
+    # songs that were never looked at are saved as the same columns they were loaded from.
+    with vgmusic.API(cache=cache) as api:
+        assert api.cache() == cache
+
+
+def test_old_cache_lazy(monkeypatch):
+    converted = []
+    song_from_cache = vgmusic._song_from_cache
+
+    def count(song):
+        converted.append(song["title"])
+        return song_from_cache(song)
+
+    monkeypatch.setattr(vgmusic, "_song_from_cache", count)
+
+    with vgmusic.API(cache=OLD_CACHE) as api:
+        system = api["NES"]
+        # songs are only created once their game is looked at.
+        assert converted == []
+        assert len(system["Castlevania"]) == 2
+        assert api.cache()["systems"]["NES"]["games"]["Castlevania"]["title"] == [
+            "Vampire Killer",
+            "Stalker",
+        ]
+        assert converted == []
+
+        assert system["Castlevania"][1].title == "Stalker"
+        assert converted == ["Vampire Killer", "Stalker"]
+
+
+@pytest.mark.parametrize("cache", [OLD_CACHE, None])
+def test_cache_copied(tmp_path, cache):
+    if cache is None:
+        # a cache in the column format.
+        with vgmusic.API(cache=OLD_CACHE) as api:
+            api.save_cache(tmp_path / "cache.json")
+        cache = vgmusic.load_cache(tmp_path / "cache.json")
+
+    with vgmusic.API(cache=cache) as api:
+        # changing the serialised cache doesn't change the api.
+        saved = api.cache()
+        saved["urls"].clear()
+        for columns in saved["systems"]["NES"]["games"].values():
+            for column in columns.values():
+                column.clear()
+
+        assert "NES" in api.available()
+        assert _songs(api) == {"NES": SYSTEM_SONGS}
@@ -0,0 +1,64 @@
+# coding: utf8
+
+import pytest
+from click.testing import CliRunner
+
+from vgmusic import vgmusic
+
+from conftest import SYSTEM_PAGE, Session
+
+OTHER_URL = "https://vgmusic.com/music/console/nintendo/snes/"
+
+
+@pytest.fixture
+def cli(cache_file, monkeypatch):
+    # the rest api (imported by the cli if fastapi is installed) loads cache.json from the current directory.
+    monkeypatch.chdir(cache_file.parent)
+    # nothing is downloaded for real.
+    monkeypatch.setattr(
+        vgmusic, "_new_session", lambda: Session({OTHER_URL: (200, SYSTEM_PAGE)})
+    )
+
+    from vgmusic import cli
+
+    return cli.cli
+
+
+def _run(cli, *args):
+    result = CliRunner().invoke(cli, args, catch_exceptions=False)
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+def test_search(cli, cache_file):
+    cache = cache_file.read_bytes()
+
+    output = _run(cli, "search", "-c", str(cache_file), "title=^Stalker$")
+
+    assert "Showing results 0-1 of 1" in output
+    assert "title: Stalker\n" in output
+    # searching doesn't rewrite the cache.
+    assert cache_file.read_bytes() == cache
+
+
+def test_parse_unchanged(cli, cache_file):
+    cache = cache_file.read_bytes()
+
+    _run(cli, "parse", "-c", str(cache_file))
+
+    # every system is already cached, so nothing is downloaded and the cache isn't rewritten.
+    assert cache_file.read_bytes() == cache
+
+
+def test_parse_new_system(cli, cache_file):
+    cache = vgmusic.load_cache(cache_file)
+    cache["urls"]["SNES"] = OTHER_URL
+    vgmusic.save_cache(cache, cache_file, indent=False)
+
+    _run(cli, "parse", "-c", str(cache_file))
+
+    # the system that wasn't cached yet is downloaded and saved.
+    cache = vgmusic.load_cache(cache_file)
+    assert set(cache["systems"]) == {"NES", "SNES"}
+    games = cache["systems"]["SNES"]["games"]
+    assert games["Castlevania"]["title"] == ["Vampire Killer", "Stalker"]
@@ -0,0 +1,77 @@
+# coding: utf8
+
+import io
+
+import pytest
+import requests
+
+from vgmusic import vgmusic
+
+from conftest import Session
+
+SONG_URL = "https://vgmusic.com/music/console/nintendo/nes/Title_Screen.mid"
+
+
+def _song(url=SONG_URL, title="Title Screen"):
+    return vgmusic.Song(url, title, 4, "John Doe", "0" * 32)
+
+
+class _DroppedConnection(io.BytesIO):
+    # the connection drops after the first few bytes of the body.
+    def read(self, size=-1):
+        if self.tell():
+            raise requests.ConnectionError("connection dropped")
+        return super().read(2)
+
+
+def test_save(tmp_path):
+    session = Session({SONG_URL: (200, b"MThd")})
+
+    _song().save(tmp_path / "song.mid", session=session)
+
+    assert (tmp_path / "song.mid").read_bytes() == b"MThd"
+    assert [p.name for p in tmp_path.iterdir()] == ["song.mid"]
+
+
+def test_save_error(tmp_path):
+    session = Session({SONG_URL: (404, b"<html>Not Found</html>")})
+
+    with pytest.raises(requests.HTTPError):
+        _song().save(tmp_path / "song.mid", session=session)
+
+    # an error page is never saved as a song.
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_dropped(tmp_path, monkeypatch):
+    session = Session({SONG_URL: (200, b"MThd")})
+    (tmp_path / "song.mid").write_bytes(b"old!")
+
+    get = session.get
+
+    def dropped_get(url, **kwargs):
+        resp = get(url, **kwargs)
+        resp.raw = _DroppedConnection(b"MThd")
+        return resp
+
+    monkeypatch.setattr(session, "get", dropped_get)
+
+    with pytest.raises(requests.ConnectionError):
+        _song().save(tmp_path / "song.mid", session=session)
+
+    # the file that was there is left as it was, without a partial download next to it.
+    assert (tmp_path / "song.mid").read_bytes() == b"old!"
+    assert [p.name for p in tmp_path.iterdir()] == ["song.mid"]
+
+
+def test_api_download_same_title(tmp_path):
+    # the same title on several systems is saved to one file, but always as a whole song.
+    songs = [_song(f"{SONG_URL}?{i}") for i in range(20)]
+    contents = {song.url: b"MThd" + bytes([i]) * 4096 for i, song in enumerate(songs)}
+
+    with vgmusic.API(cache={"urls": {}, "systems": {}}) as api:
+        api.session = Session({url: (200, data) for url, data in contents.items()})
+        api.download(songs, tmp_path, max_requests=8)
+
+    assert [p.name for p in tmp_path.iterdir()] == ["Title Screen.mid"]
+    assert (tmp_path / "Title Screen.mid").read_bytes() in contents.values()
@@ -1,4 +1,91 @@
-import vgmusic
-
-with vgmusic.API(force_cache=["Nintendo Switch"]) as api:
-    print(api.search_by_regex("Nintendo Switch", "Sonic Mania", "Act"))
+# coding: utf8
+
+import pathlib
+import re
+
+import pytest
+
+from vgmusic import vgmusic
+
+# the full dump at the root of the repo (in the old one-dict-per-song format).
+CACHE_PATH = pathlib.Path(__file__).parent.parent / "cache.json"
+
+QUERIES = [
+    {},
+    {"system": "^NES$"},
+    {"system": "Game ?Boy", "url": r"\.mid$"},
+    {"game": "Mario", "title": "(?i)theme"},
+    {"title": "e", "author": "a", "size": "1"},
+    {"url": "e", "md5": "^a"},
+    {"system": "SNES", "game": "^Super", "size": "^1"},
+    {"system": "^(NES|SNES)$", "title": "e", "author": "a", "md5": "[0-7]$"},
+    {"title": "^.*$"},
+    {"title": "^$"},
+    {"author": ".*", "title": "", "md5": "^"},
+    {"system": "no such system"},
+]
+
+
+def _reference_search(api, regexes):
+    # the obvious implementation: every regex against every song.
+    def value(system_name, game_name, song, field):
+        if field == "system":
+            return system_name
+        if field == "game":
+            return game_name
+        return str(getattr(song, field))
+
+    return [
+        song
+        for system_name, system in api.items()
+        for game_name, songs in system.items()
+        for song in songs
+        if all(
+            re.search(regex, value(system_name, game_name, song, field))
+            for field, regex in regexes.items()
+        )
+    ]
+
+
+@pytest.fixture(scope="module")
+def api():
+    with vgmusic.API.load_cache(CACHE_PATH) as api:
+        yield api
+
+
+@pytest.mark.parametrize("regexes", QUERIES)
+def test_search_by_regex(api, regexes):
+    assert api.search_by_regex(**regexes) == _reference_search(api, regexes)
+
+
+def test_search_by_regex_newlines():
+    # '^.*$' doesn't match across a newline, so it can't be skipped like '.*'.
+    song = {"url": "a.mid", "title": "two\nlines", "size": 1, "author": "a", "md5": "0"}
+    cache = {
+        "urls": {},
+        "systems": {"NES": {"url": "", "version": "", "games": {"A": [song]}}},
+    }
+
+    with vgmusic.API(cache=cache) as api:
+        assert api.search_by_regex(title="^.*$") == []
+        assert len(api.search_by_regex(title=".*")) == 1
+
+
+@pytest.mark.parametrize("field", ["cache", "__class__", "song", "games"])
+def test_search_by_regex_unknown_field(api, field):
+    with pytest.raises(ValueError):
+        api.search_by_regex(**{field: "a"})
+
+
+@pytest.mark.parametrize(
+    "spans", [[(0, 10)], [(0, 10000)], [(5, 300), (1000, 1001), (2000, 9000)]]
+)
+def test_sample(spans):
+    total = sum(stop - start for start, stop in spans)
+    sample = vgmusic._sample(spans, total)
+
+    # only songs being searched are sampled, evenly and at most _SAMPLE_SIZE of them.
+    assert 0 < len(sample) <= vgmusic._SAMPLE_SIZE
+    assert len(sample) == len(set(sample))
+    assert all(any(start <= i < stop for start, stop in spans) for i in sample)
+    assert len(sample) >= min(total, vgmusic._SAMPLE_SIZE // 2)
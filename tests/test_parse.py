@@ -0,0 +1,49 @@
+# coding: utf8
+
+import pytest
+
+from vgmusic import vgmusic
+
+from conftest import SYSTEM_PAGE, SYSTEM_SONGS, SYSTEM_URL, Session
+
+ERROR_PAGE = b"""\
+<html><head><title>503 Service Unavailable</title></head>
+<body><h1>Service Unavailable</h1><address>Apache Server at vgmusic.com Port 443</address></body>
+</html>
+"""
+
+
+def _songs(system):
+    return {game: [song.cache() for song in songs] for game, songs in system.items()}
+
+
+def test_parse_system(parser):
+    session = Session({SYSTEM_URL: (200, SYSTEM_PAGE)})
+    system = vgmusic.System(SYSTEM_URL, session=session, parser=parser)
+
+    assert _songs(system) == SYSTEM_SONGS
+    assert system.version == "4.0.3"
+    assert system.total_songs() == 3
+
+
+def test_parse_chunks(parser, monkeypatch):
+    # rows split over chunk boundaries are still parsed whole.
+    iter_content = vgmusic.requests.Response.iter_content
+    monkeypatch.setattr(
+        vgmusic.requests.Response,
+        "iter_content",
+        lambda self, chunk_size=1, **kwargs: iter_content(self, 7),
+    )
+
+    session = Session({SYSTEM_URL: (200, SYSTEM_PAGE)})
+    system = vgmusic.System(SYSTEM_URL, session=session, parser=parser)
+
+    assert _songs(system) == SYSTEM_SONGS
+
+
+def test_parse_no_table(parser):
+    # an error page is never taken for a system without songs.
+    session = Session({SYSTEM_URL: (200, ERROR_PAGE)})
+
+    with pytest.raises(ValueError):
+        vgmusic.System(SYSTEM_URL, session=session, parser=parser)
@@ -0,0 +1,89 @@
+# coding: utf8
+
+import importlib
+import sys
+
+import pytest
+
+from vgmusic import vgmusic
+
+from conftest import SYSTEM_PAGE, SYSTEM_SONGS, SYSTEM_URL, Session
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+pytest.importorskip("uvicorn")
+
+OTHER_URL = "https://vgmusic.com/music/console/nintendo/snes/"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+
+@pytest.fixture
+def rest(cache_file, monkeypatch):
+    # the rest api loads cache.json from the current directory when it is imported.
+    monkeypatch.chdir(cache_file.parent)
+    # the SNES isn't cached yet.
+    cache = vgmusic.load_cache(cache_file)
+    cache["urls"]["SNES"] = OTHER_URL
+    vgmusic.save_cache(cache, cache_file, indent=False)
+
+    monkeypatch.setattr(
+        vgmusic, "_new_session", lambda: Session({OTHER_URL: (200, SYSTEM_PAGE)})
+    )
+    monkeypatch.delitem(sys.modules, "vgmusic.rest", raising=False)
+
+    rest = importlib.import_module("vgmusic.rest")
+    yield rest
+    rest.api.close()
+
+
+@pytest.fixture
+def client(rest):
+    with TestClient(rest.app) as client:
+        yield client
+
+
+def test_system(client):
+    resp = client.get("/systems/NES")
+    assert resp.status_code == 200
+
+    # songs are objects (like in /search), not the cache's columns, and the etag and hash aren't sent.
+    assert resp.json() == {
+        "data": {"url": SYSTEM_URL, "version": "4.0.3", "games": SYSTEM_SONGS}
+    }
+    assert client.get("/systems/NES").content == resp.content
+
+
+def test_search(client):
+    resp = client.get("/search", params={"game": "^Castlevania$", "title": "^Stalker$"})
+    assert resp.status_code == 200
+    assert resp.json() == {"data": [SYSTEM_SONGS["Castlevania"][1]]}
+
+
+@pytest.mark.parametrize("params", [{"cache": "a"}, {"workers": "4"}, {"title": "("}])
+def test_search_bad_query(client, params):
+    # unknown fields and invalid regexes are the client's fault.
+    assert client.get("/search", params=params).status_code == 400
+
+
+def test_systems(client):
+    # all systems, not just the cached ones.
+    assert client.get("/systems").json() == {"data": ["NES", "SNES"]}
+
+
+def test_shutdown_unchanged(rest, cache_file):
+    cache = cache_file.read_bytes()
+
+    with TestClient(rest.app) as client:
+        client.get("/systems/NES")
+        client.get("/search", params={"title": "a"})
+
+    # nothing was downloaded, so the cache isn't rewritten.
+    assert cache_file.read_bytes() == cache
+
+
+def test_shutdown_saves(rest, cache_file):
+    with TestClient(rest.app) as client:
+        assert client.get("/systems/SNES").status_code == 200
+
+    assert set(vgmusic.load_cache(cache_file)["systems"]) == {"NES", "SNES"}
@@ -0,0 +1,131 @@
+# coding: utf8
+
+import pytest
+import requests
+
+from vgmusic import vgmusic
+
+from conftest import SYSTEM_PAGE, SYSTEM_URL, Session
+
+CHANGED_PAGE = SYSTEM_PAGE.replace(b"Vampire Killer", b"Vampire Killer (Remix)")
+OTHER_URL = "https://vgmusic.com/music/console/nintendo/snes/"
+
+
+@pytest.fixture
+def api():
+    session = Session(
+        {
+            SYSTEM_URL: (200, SYSTEM_PAGE, {"ETag": '"v1"'}),
+            OTHER_URL: (200, SYSTEM_PAGE, {"ETag": '"v1"'}),
+        }
+    )
+    urls = {"NES": SYSTEM_URL, "SNES": OTHER_URL}
+
+    with vgmusic.API(cache={"urls": urls, "systems": {}}) as api:
+        api.session = session
+        api["NES"]
+        api.modified = False
+        yield api
+
+
+def test_load_hash(parser, monkeypatch):
+    session = Session({SYSTEM_URL: (200, SYSTEM_PAGE, {"ETag": '"v1"'})})
+
+    if parser == "lxml":
+        # the page is hashed as it is streamed, instead of being read into memory first.
+        def content(self):
+            raise AssertionError("page read into memory")
+
+        monkeypatch.setattr(vgmusic.requests.Response, "content", property(content))
+
+    system = vgmusic.System(SYSTEM_URL, session=session, parser=parser)
+    assert system.content_hash == vgmusic._hash(SYSTEM_PAGE)
+    assert system.etag == '"v1"'
+
+
+def test_update_not_modified(api):
+    api.session.pages[SYSTEM_URL] = (304, b"", {"ETag": '"v1"'})
+
+    assert api.update() == []
+    assert api.session.requests[-1] == (SYSTEM_URL, {"If-None-Match": '"v1"'})
+    assert not api.modified
+
+
+def test_update_same_etag(api):
+    # servers that ignore If-None-Match send the page anyway.
+    api.session.pages[SYSTEM_URL] = (200, CHANGED_PAGE, {"ETag": '"v1"'})
+
+    assert api.update() == []
+    assert not api.modified
+    assert api["NES"]["Castlevania"][0].title == "Vampire Killer"
+
+
+def test_update_new_etag(api, tmp_path):
+    # the ETag changed, but the page didn't.
+    api.session.pages[SYSTEM_URL] = (200, SYSTEM_PAGE, {"ETag": '"v2"'})
+
+    assert api.update() == []
+    assert api["NES"].etag == '"v2"'
+    # so the new ETag is saved.
+    assert api.modified
+
+    api.save_cache(tmp_path / "cache.json")
+    cache = vgmusic.load_cache(tmp_path / "cache.json")
+    assert cache["systems"]["NES"]["etag"] == '"v2"'
+
+    api.modified = False
+    assert api.update() == []
+    assert api.session.requests[-1] == (SYSTEM_URL, {"If-None-Match": '"v2"'})
+    assert not api.modified
+
+
+def test_update_changed(api):
+    assert [song.title for song in api.search_by_regex(title="Remix")] == []
+
+    api.session.pages[SYSTEM_URL] = (200, CHANGED_PAGE, {"ETag": '"v2"'})
+
+    assert api.update() == ["NES"]
+    assert api.modified
+    assert api["NES"].etag == '"v2"'
+    assert api["NES"].content_hash == vgmusic._hash(CHANGED_PAGE)
+    # searches see the new songs.
+    assert [song.title for song in api.search_by_regex(title="Remix")] == [
+        "Vampire Killer (Remix)"
+    ]
+
+
+@pytest.mark.parametrize(
+    "page, error",
+    [
+        ((503, b"<html>Service Unavailable</html>"), requests.HTTPError),
+        ((200, b"<html><body>Service Unavailable</body></html>"), ValueError),
+    ],
+)
+def test_update_error(api, parser, page, error):
+    system = api["NES"]
+    system.parser = parser
+    api.session.pages[SYSTEM_URL] = page
+
+    with pytest.raises(error):
+        system.update()
+
+    # the songs parsed before are kept.
+    assert system.total_songs() == 3
+    assert system.etag == '"v1"'
+    assert system.content_hash == vgmusic._hash(SYSTEM_PAGE)
+
+
+def test_api_update_error(api):
+    # one system failing to update doesn't lose the ones that were updated.
+    api["SNES"]
+    api.modified = False
+
+    api.session.pages[SYSTEM_URL] = (200, CHANGED_PAGE, {"ETag": '"v2"'})
+    api.session.pages[OTHER_URL] = (503, b"")
+
+    with pytest.raises(requests.HTTPError):
+        api.update()
+
+    assert api.modified
+    assert api["NES"].etag == '"v2"'
+    assert api["SNES"].etag == '"v1"'
@@ -0,0 +1,67 @@
+# coding: utf8
+
+import random
+from urllib.parse import urljoin
+
+import pytest
+
+from vgmusic import vgmusic
+
+BASES = [
+    "https://vgmusic.com",
+    "https://vgmusic.com/",
+    "https://vgmusic.com/music/console/nintendo/nes/",
+    "https://vgmusic.com/music/console/nintendo/nes/index.html?page=1#top",
+    "https://vgmusic.com/music/console/../nintendo/./nes/",
+    "https://vgmusic.com/music//nes/",
+    "https://vgmusic.com/music/nes/..",
+    "https://vgmusic.com/music;p/nes/",
+    "https://user@vgmusic.com:8080/music/",
+]
+
+HREFS = [
+    "a.mid",
+    "Title_Screen.mid",
+    "x;",
+    ".;x",
+    "a;b.mid",
+    " a.mid",
+    "a.mid\n",
+    "a\tb.mid",
+    "a b.mid",
+    "a\x00.mid",
+    "a\xa0.mid",
+    "%20a.mid",
+    "..a.mid",
+    "",
+    ".",
+    "..",
+    "#top",
+    "?page=2",
+    "../snes/a.mid",
+    "/music/a.mid",
+    "//example.com/a.mid",
+    "http://example.com/a.mid",
+    "mailto:a@example.com",
+]
+
+# characters urljoin treats specially, in random hrefs.
+ALPHABET = "ab.;/?#:%@= \t\n\x00\xe9"
+
+
+@pytest.mark.parametrize("base", BASES)
+def test_url_joiner(base):
+    join = vgmusic._url_joiner(base)
+
+    for href in HREFS:
+        assert join(href) == urljoin(base, href), href
+
+
+@pytest.mark.parametrize("base", BASES)
+def test_url_joiner_random(base):
+    join = vgmusic._url_joiner(base)
+    rand = random.Random(base)
+
+    for _ in range(2000):
+        href = "".join(rand.choice(ALPHABET) for _ in range(rand.randint(0, 6)))
+        assert join(href) == urljoin(base, href), href
@@ -1,7 +1,6 @@
 # coding: utf8
 
 import functools
-import json
 import logging
 import pathlib
 
@@ -19,7 +18,7 @@ _log = logging.getLogger("vgmusic")
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 logging.basicConfig(level=logging.DEBUG)
 
-click.option = functools.partial(click.option, show_default=True)  # type:ignore
+click.option = functools.partial(click.option, show_default=True)  # type: ignore
 
 
 @click.group()
@@ -53,21 +52,29 @@ def cli():
     """
 
 
-def _parse(cache_file):
+def _load(cache_file):
+    # searching only needs what is already cached, so don't touch VGMusic or rewrite the cache.
     try:
-        with cache_file.open() as f:
-            cache = json.load(f)
+        return API.load_cache(cache_file)
     except FileNotFoundError:
-        cache = None
+        # nothing to search yet.
+        return _refresh(cache_file)
 
-    api = API(cache=cache)
+
+def _refresh(cache_file, api=None):
+    if api is None:
+        try:
+            api = API.load_cache(cache_file)
+        except FileNotFoundError:
+            api = API()
 
     try:
         api.force_cache()
 
     finally:
-        with cache_file.open("w") as f:
-            json.dump(api.cache(), f, indent=2)
+        # don't rewrite the whole cache if nothing new was downloaded.
+        if api.modified:
+            api.save_cache(cache_file)
 
     return api
 
@@ -82,7 +89,7 @@ def _parse(cache_file):
 )
 def parse(cache_file):
     """Parse all VGMusic website data without downloading any midi files."""
-    _parse(cache_file)
+    _refresh(cache_file)
 
 
 def _search(api, search_query):
@@ -109,7 +116,7 @@ def _search(api, search_query):
 )
 def search(search_query, cache_file, n_results):
     """Show results of a search query."""
-    api = _parse(cache_file)
+    api = _load(cache_file)
     songs = _search(api, search_query)
 
     start = 0
@@ -124,10 +131,10 @@ def search(search_query, cache_file, n_results):
 
         for song in songs[start:end]:
             fields = song.cache()
-            for field, value in fields.items():
-                print(f"{field}: {value}")
-
-            click.echo("")
+            # one write per song (the trailing newline leaves a blank line between songs)
+            click.echo(
+                "".join(f"{field}: {value}\n" for field, value in fields.items())
+            )
 
         start = end
 
@@ -156,7 +163,7 @@ def search(search_query, cache_file, n_results):
 def download(search_query, cache_file, download_to):
     """Download MIDI files from VGMusic by a search query."""
 
-    api = _parse(cache_file)
+    api = _load(cache_file)
 
     if search_query:
         songs = _search(api, search_query)
@@ -166,6 +173,8 @@ def download(search_query, cache_file, download_to):
             "WARNING: You are about to download ALL of VGMusic's MIDI files. Are you sure?",
             abort=True,
         ):
+            # make sure ALL really means all of them.
+            _refresh(cache_file, api)
             songs = api.search(lambda s, g, sg: True)
 
     _log.info("downloading %s songs", len(songs))
@@ -1,36 +1,67 @@
 # coding: utf8
 
-import json
 import pathlib
+import re
 
 import fastapi
+import orjson
 import uvicorn
+from fastapi.responses import ORJSONResponse
 
 from .vgmusic import API
 
-
-app = fastapi.FastAPI()
+# responses are big lists of songs, which orjson serialises a lot faster than json.
+# (endpoints return the responses themselves, so fastapi doesn't run jsonable_encoder over every song first.)
+app = fastapi.FastAPI(default_response_class=ORJSONResponse)
 
 cache_path = pathlib.Path() / "cache.json"
 
 try:
-    cache = json.loads(cache_path.read_text())
+    api = API.load_cache(cache_path)
 except FileNotFoundError:
-    cache = None
+    api = API()
+
+# system data only changes when its page is downloaded again (never while the server is up),
+# so each system is serialised once and the same bytes are sent every time after that.
+system_responses = {}
+
 
-api = API(cache=cache)
+def _system_data(system):
+    # songs are sent as objects like in /search, not in the cache's column format.
+    return {
+        "url": system.url,
+        "version": system.version,
+        "games": {
+            game: [song.cache() for song in songs] for game, songs in system.items()
+        },
+    }
 
 
 @app.get("/systems")
 def systems():
     """Get a list of all systems available."""
-    return {"data": list(api.keys())}
+    return ORJSONResponse({"data": api.available()})
 
 
 @app.get("/systems/{system}")
 def systems_data(system: str):
-    """Get data for a system."""
-    return {"data": api[system].cache()}
+    """Get data for a system.
+
+    The data is an object:
+    {
+        'url': // The system page url.
+        'version': // The version of the VGMusic indexer that generated the system page.
+        'games': // An object mapping game names to a list of songs (see /search).
+    }
+    """
+    content = system_responses.get(system)
+
+    if content is None:
+        content = system_responses[system] = orjson.dumps(
+            {"data": _system_data(api[system])}
+        )
+
+    return fastapi.Response(content=content, media_type="application/json")
 
 
 @app.get("/search")
@@ -54,12 +85,18 @@ def search(query: fastapi.Request):
 
     'url', 'title', 'size', 'author', 'md5': Match against the song's respective field.
     """
-    return {"data": [s.cache() for s in api.search_by_regex(**query.query_params)]}
+    try:
+        songs = api.search_by_regex(**query.query_params)
+    except (ValueError, re.error) as e:
+        raise fastapi.HTTPException(status_code=400, detail=str(e))
+
+    return ORJSONResponse({"data": [s.cache() for s in songs]})
 
 
 @app.on_event("shutdown")
 def shutdown():
-    cache_path.write_text(json.dumps(api.cache()))
+    if api.modified:
+        api.save_cache(cache_path, indent=False)
 
 
 if __name__ == "__main__":
@@ -3,52 +3,333 @@
 import collections
 import collections.abc as c_abc
 import concurrent.futures as c_futures
+import functools
 import hashlib
+import itertools
+import json
 import logging
+import operator
+import os
 import pathlib
 import re
+import shutil
+import sys
+import threading
+import uuid
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 from urllib.parse import urljoin
 
-import bs4
 import requests
+from lxml import etree
+from urllib3.util import Retry, make_headers
+
+try:
+    import html5lib
+except ImportError:
+    html5lib = None
+
+try:
+    import html5_parser
+except (ImportError, RuntimeError):
+    # RuntimeError is raised if html5-parser and lxml are linked to different libxml2 versions.
+    html5_parser = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 __version__ = "1.0.2"
 
 _log = logging.getLogger("vgmusic")
 
 # html.parser has problems with vgmusic's table cells.
-BS4_PARSER = "html5lib"
+# lxml handles them fine and is much faster than html5lib, which is kept as a fallback.
+HTML_PARSER = "lxml"
 VGMUSIC_URL = "https://vgmusic.com"
+# the number of connections kept open to VGMusic (and threads used to make requests on them).
+MAX_CONNECTIONS = 32
+# server errors worth retrying a request for.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
 
-RE_INFO_URL = re.compile(r"/file/(.*)\.html")
+def _xpath(path):
+    # smart strings keep a reference to the whole tree, so don't use them.
+    return etree.XPath(path, smart_strings=False)
+
+
+XPATH_MENUS = _xpath(
+    "//p[contains(concat(' ', normalize-space(@class), ' '), ' menu ')]"
+)
+XPATH_LINKS = _xpath(".//a")
+XPATH_TABLE = _xpath("(//table)[1]")
+XPATH_HREF = _xpath("string(.//a/@href)")
+XPATH_TEXT = _xpath("string()")
+XPATH_VERSION = _xpath("string((//address)[1])")
 
 
 def _is_empty(tag):
-    return (not tag.text) or tag.text.isspace()
+    # string() concatenates the text in C, which is faster than probing itertext() from Python,
+    # even though it can stop at the first non-whitespace text.
+    text = XPATH_TEXT(tag)
+    return (not text) or text.isspace()
+
+
+def _resp2tree(resp, parser=HTML_PARSER):
+    encoding = resp.encoding or "utf-8"
+
+    if parser == "html5lib":
+        if html5_parser is not None:
+            # same parsing algorithm as html5lib, but implemented in C.
+            return html5_parser.parse(resp.content, transport_encoding=encoding)
+
+        if html5lib is None:
+            raise ImportError(
+                "the html5lib parser needs html5-parser or html5lib (pip install vgmusic[html5])"
+            )
+
+        return html5lib.parse(
+            resp.content,
+            treebuilder="lxml",
+            namespaceHTMLElements=False,
+            transport_encoding=encoding,
+        ).getroot()
+
+    # feed the raw bytes with a known encoding so lxml does not have to sniff it,
+    # as they are downloaded (so the whole body is never held in memory at once).
+    html_parser = etree.HTMLParser(encoding=encoding)
+    for chunk in resp.iter_content(chunk_size=64 * 1024):
+        html_parser.feed(chunk)
+
+    return html_parser.close()
+
+
+def _table_rows(tree):
+    tables = XPATH_TABLE(tree)
+    if not tables:
+        raise ValueError("no song table in page")
+
+    (table,) = tables
+
+    # html5lib wraps the rows in a tbody.
+    body = table.find("tbody")
+    if body is not None:
+        table = body
+
+    # rows are direct children, so there's no need to search the whole table for them.
+    # first two rows are header info, ignore (without building a list of all rows first)
+    return itertools.islice(table.iterchildren("tr"), 2, None)
+
+
+def _parse_version(tree):
+    # 'Page generated by VGMIndex <version>.'
+    return XPATH_VERSION(tree).strip().split()[-1].rstrip(".")
+
+
+def _new_session():
+    session = requests.Session()
+    # keep enough connections alive for concurrent downloads to reuse them,
+    # and retry the occasional dropped connection or overloaded server
+    # (the last response is still returned if all retries fail).
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=MAX_CONNECTIONS,
+        pool_maxsize=MAX_CONNECTIONS,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=RETRY_STATUSES,
+            raise_on_status=False,
+        ),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # ask for every compression urllib3 can decode here (including brotli, if installed).
+    # older versions of requests only ask for gzip/deflate.
+    session.headers["Accept-Encoding"] = make_headers(accept_encoding=True)[
+        "accept-encoding"
+    ]
+    session.headers["User-Agent"] = f"vgmusic.py/{__version__}"
+
+    return session
+
+
+class _FilenameTable(dict):
+    # str.translate() table that deletes anything but alphanumeric characters and spaces.
+    # Unicode is too big to build the whole table up front, so each character is checked once when first seen.
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        # space is the only whitespace allowed in filenames
+        self[codepoint] = value = codepoint if char.isalnum() or char == " " else None
+        return value
+
+
+_FILENAME_TABLE = _FilenameTable()
 
 
-def _is_header(tag):
-    try:
-        class_name = tag["class"][0]
-    except (KeyError, IndexError):
-        class_name = ""
+def _escape_filename(name):
+    return name.translate(_FILENAME_TABLE)
 
-    return class_name == "header"
 
+def _md5_from_url(url):
+    # info urls look like '.../file/<md5>.html'.
+    start = url.find("/file/") + len("/file/")
+    end = url.rfind(".html")
 
-def _resp2soup(resp):
-    return bs4.BeautifulSoup(resp.text, BS4_PARSER)
+    if start < len("/file/") or end < start:
+        raise ValueError(f"not a song info url: {url}")
 
+    return url[start:end]
 
-def _escape_filename(name):
-    # space is the only whitespace allowed in filenames
-    return "".join(c for c in name if c.isalnum() or c == " ")
 
+# regexes that re.search() matches against any string.
+# ('^.*$' isn't one: '.' doesn't match a newline, so it doesn't match 'a\nb'.)
+_MATCH_ANYTHING = frozenset(["", "^", "$", ".*", "^.*", ".*$"])
+
+
+# the rest api gets the same popular queries over and over, so keep their regexes around.
+@functools.lru_cache(maxsize=512)
+def _compile_or_none(regex):
+    # returns the bound search method of the compiled regex,
+    # or None if the regex matches anything (so it doesn't need to be searched at all).
+    if regex is None or regex in _MATCH_ANYTHING:
+        return None
+
+    return re.compile(regex).search
+
+
+# song fields from shortest to longest value (regexes are quicker to run on shorter values).
+_FIELD_ORDER = {"size": 0, "md5": 1, "author": 2, "title": 3, "url": 4}
+
+
+def _field_searches(regexes):
+    # (field, search) for all song fields in regexes that actually need to be searched,
+    # cheapest first: a song has to match all of them, so the later ones only run on what the earlier ones matched.
+    for field in regexes:
+        if field not in ("system", "game") and field not in Song.__slots__:
+            raise ValueError(f"not a song field: {field!r}")
+
+    searches = (
+        (field, _compile_or_none(regex))
+        for field, regex in regexes.items()
+        if field not in ("system", "game")
+    )
+    return sorted(
+        ((field, search) for field, search in searches if search is not None),
+        key=lambda field_search: _FIELD_ORDER.get(field_search[0], len(_FIELD_ORDER)),
+    )
+
+
+def _new_hash(content=b""):
+    # only used to tell if a page changed, so it just needs to be fast.
+    return hashlib.blake2b(content, digest_size=16)
+
+
+def _hash(content):
+    return _new_hash(content).hexdigest()
+
+
+# how many songs to run each regex over, to guess which one matches the fewest.
+_SAMPLE_SIZE = 256
 
-def _md5_from_url(url):
-    return RE_INFO_URL.findall(url)[0]
+
+def _sample(spans, total):
+    # At most _SAMPLE_SIZE indexes, spread evenly over the total songs in spans.
+    # (the step is rounded up, so the sample is never bigger.)
+    step = -(-total // _SAMPLE_SIZE)
+    indexes = itertools.chain.from_iterable(itertools.starmap(range, spans))
+    return list(itertools.islice(indexes, 0, None, step))
+
+
+def _sample_matches(check, sample):
+    # Roughly how many songs a regex matches, from how many of the sample it matches.
+    column, search = check
+    return sum(map(bool, map(search, map(column.__getitem__, sample))))
+
+
+# a filename with nothing urljoin would treat specially:
+# no scheme, path, params, query or fragment,
+# and no whitespace or control characters (which urljoin strips or drops).
+_PLAIN_FILENAME = re.compile(r"[^\s\x00-\x1f\x7f/:;?#]+")
+
+
+def _url_joiner(base):
+    # song links are almost always plain filenames relative to the page,
+    # which can be joined without re-parsing the base url every time.
+    path = base.partition("#")[0].partition("?")[0]
+    prefix = path[: path.rfind("/") + 1]
+
+    # urljoin also normalises the base path (dot segments, empty segments, a missing '/' after the host),
+    # which the prefix can't be used as-is for.
+    if urljoin(base, "a") != prefix + "a":
+        return functools.partial(urljoin, base)
+
+    is_plain = _PLAIN_FILENAME.fullmatch
+
+    def join(href):
+        if is_plain(href) and href not in (".", ".."):
+            return prefix + href
+
+        return urljoin(base, href)
+
+    return join
+
+
+def load_cache(path: Union[str, pathlib.Path]) -> dict:
+    """Load a cache previously saved with save_cache().
+    orjson is used to parse it if installed (much faster than json on large caches).
+
+    Args:
+        path: The path to the cache file.
+
+    Returns:
+        The cache, which can be passed to API(cache=...).
+
+    Raises:
+        FileNotFoundError, if the cache file does not exist.
+    """
+
+    data = pathlib.Path(path).read_bytes()
+
+    if orjson is not None:
+        return orjson.loads(data)
+
+    return json.loads(data)
+
+
+def save_cache(cache: dict, path: Union[str, pathlib.Path], indent: bool = True):
+    """Save a cache from API.cache() to disk.
+    orjson is used to serialise it if installed (much faster than json on large caches).
+
+    The cache is written to a temporary file next to path first, which then replaces path,
+    so a crash while saving never leaves a half-written cache behind.
+
+    Args:
+        cache: The cache to save.
+        path: The path to the cache file.
+        indent: Whether or not to indent the cache (by two spaces) to make it human-readable.
+            If not specified, defaults to True.
+    """
+
+    if orjson is not None:
+        option = orjson.OPT_APPEND_NEWLINE
+        if indent:
+            option |= orjson.OPT_INDENT_2
+
+        data = orjson.dumps(cache, option=option)
+    else:
+        data = (json.dumps(cache, indent=2 if indent else None) + "\n").encode("utf8")
+
+    path = pathlib.Path(path)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+
+    try:
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
 
 
 @dataclass
@@ -66,6 +347,9 @@ class Song:
         See args.
     """
 
+    # no per-instance __dict__: a full crawl creates a lot of songs.
+    __slots__ = ("url", "title", "size", "author", "md5")
+
     url: str
     title: str
     size: int
@@ -74,7 +358,13 @@ class Song:
 
     def cache(self) -> dict:
         """Serialise all fields in this song to a dictionary representation."""
-        return self.__dict__
+        return {
+            "url": self.url,
+            "title": self.title,
+            "size": self.size,
+            "author": self.author,
+            "md5": self.md5,
+        }
 
     def download(
         self, session: Optional[requests.Session] = None, verify: bool = False
@@ -115,6 +405,179 @@ class Song:
 
         return data
 
+    def save(
+        self, path: Union[str, pathlib.Path], session: Optional[requests.Session] = None
+    ):
+        """Download this song's midi file straight to a file, without holding all of it in memory.
+
+        The file is downloaded to a temporary file next to path first, which then replaces path,
+        so a failed download never leaves a partial file behind.
+
+        Args:
+            path: The path to save the midi file to.
+            session: The session to use to download.
+                If not specified, requests.get will be used instead.
+
+        Raises:
+            requests.HTTPError, if the midi file could not be downloaded.
+        """
+
+        _log.info("downloading %s to %s", self.url, path)
+
+        path = pathlib.Path(path)
+        get = requests.get if session is None else session.get
+
+        with get(self.url, stream=True) as resp:
+            resp.raise_for_status()
+
+            # let urllib3 undo any content encoding while the body is copied.
+            resp.raw.decode_content = True
+
+            # a unique name, as songs with the same title may be saved to the same path at the same time.
+            tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+            try:
+                with tmp_path.open("xb") as f:
+                    shutil.copyfileobj(resp.raw, f, 64 * 1024)
+                os.replace(tmp_path, path)
+            except BaseException:
+                if tmp_path.exists():
+                    tmp_path.unlink()
+                raise
+
+
+def _song_from_cache(song):
+    # most authors have sequenced many songs, so share one copy of each name.
+    return Song(
+        song["url"],
+        song["title"],
+        song["size"],
+        sys.intern(song["author"]),
+        song["md5"],
+    )
+
+
+def _songs_from_columns(columns):
+    return list(
+        map(
+            Song,
+            columns["url"],
+            columns["title"],
+            columns["size"],
+            map(sys.intern, columns["author"]),
+            columns["md5"],
+        )
+    )
+
+
+class SongList(c_abc.MutableSequence):
+    """A list of songs in a game.
+    Songs loaded from a cache are only turned into Song objects the first time the list is accessed,
+    so loading a large cache doesn't create songs that are never used.
+
+    Args:
+        songs: The songs, either as a list of Song objects or as columns serialised by .cache().
+            A list of dicts serialised by Song.cache() (caches from older versions) is also accepted.
+            If not specified, defaults to None (the list is empty).
+    """
+
+    def __init__(self, songs: Optional[Union[list, dict]] = None):
+        # the songs from the cache (columns, or a list of dicts in older caches),
+        # until they are actually needed.
+        self._cached: Optional[Union[list, dict]] = None
+
+        if songs is None:
+            self._songs: Optional[list] = []
+
+        elif isinstance(songs, dict) or (
+            songs and all(type(song) is dict for song in songs)
+        ):
+            self._songs = None
+            self._cached = songs
+
+        else:
+            self._songs = [
+                _song_from_cache(song) if type(song) is dict else song for song in songs
+            ]
+
+    def cache(self) -> Dict[str, list]:
+        """Serialise all songs to columns (one list per field, in the same order as the songs).
+
+        Storing each field name once per game instead of once per song makes caches a lot smaller
+        and quicker to load.
+        """
+
+        cached = self._cached
+        songs = self._songs
+
+        if cached is not None:
+            # copies, so changing the cache can't change the songs.
+            if isinstance(cached, dict):
+                return {field: list(column) for field, column in cached.items()}
+
+            return {field: [song[field] for song in cached] for field in Song.__slots__}
+
+        return {
+            "url": [song.url for song in songs],
+            "title": [song.title for song in songs],
+            "size": [song.size for song in songs],
+            "author": [song.author for song in songs],
+            "md5": [song.md5 for song in songs],
+        }
+
+    def append(self, song: Song):
+        self._list().append(song)
+
+    def insert(self, index, song: Song):
+        self._list().insert(index, song)
+
+    def __getitem__(self, index):
+        return self._list()[index]
+
+    def __setitem__(self, index, song):
+        self._list()[index] = song
+
+    def __delitem__(self, index):
+        del self._list()[index]
+
+    def __len__(self):
+        cached = self._cached
+        songs = self._songs
+
+        if cached is not None:
+            return len(cached["url"] if isinstance(cached, dict) else cached)
+
+        return len(songs)
+
+    def __iter__(self):
+        return iter(self._list())
+
+    def __eq__(self, other):
+        if isinstance(other, SongList):
+            other = other._list()
+
+        return self._list() == other
+
+    def __repr__(self):
+        return f"SongList({self._list()!r})"
+
+    def _list(self):
+        # the cached songs are read before the songs, and only cleared after the songs are set,
+        # so another thread turning them into songs at the same time always sees one of them.
+        cached = self._cached
+        songs = self._songs
+
+        if songs is None:
+            if isinstance(cached, dict):
+                songs = _songs_from_columns(cached)
+            else:
+                songs = [_song_from_cache(song) for song in cached]
+
+            self._songs = songs
+            self._cached = None
+
+        return songs
+
 
 class System(c_abc.Mapping):
     """A collection of songs associated with game titles in a (video game) system.
@@ -122,15 +585,21 @@ class System(c_abc.Mapping):
     Args:
         url: The absolute url to the system page.
         session: The session used to download the page.
+            Pass the same session to every system, so they can reuse its connections.
             If not specified, defaults to None (a new session is created).
         cache: The previously serialised dict from .cache().
             If not specified, defaults to None.
+        parser: The parser used to build the page's tree ('lxml' or 'html5lib').
+            If not specified, defaults to HTML_PARSER ('lxml').
 
     Attributes:
         url (str): See args.
         session (requests.Session): See args.
-        games (Dict[str, List[Songs]]): A map of video game titles to a list of songs.
+        parser (str): See args.
+        games (Dict[str, SongList]): A map of video game titles to a list of songs.
         version (str): The version of the VGMusic indexer used to create the system page.
+        etag (Optional[str]): The ETag of the system page when it was last parsed, if any.
+        content_hash (Optional[str]): A hash of the system page when it was last parsed, if any.
     """
 
     def __init__(
@@ -138,34 +607,70 @@ class System(c_abc.Mapping):
         url: str,
         session: Optional[requests.Session] = None,
         cache: Optional[dict] = None,
+        parser: str = HTML_PARSER,
     ):
 
         self.url = url
+        self.parser = parser
 
         if session is None:
-            session = requests.Session()
+            session = _new_session()
 
         self.session = session
 
-        self.games: Dict[str, List[Song]] = collections.defaultdict(list)
+        self.games: Dict[str, SongList] = {}
 
         if cache:
 
             self.url = cache["url"]
             self.version = cache["version"]
+            # caches from older versions don't have an etag.
+            self.etag = cache.get("etag")
+            self.content_hash = cache.get("content_hash")
             for game, songs in cache["games"].items():
-                self.games[game] = [Song(**song) for song in songs]
+                self.games[game] = SongList(songs)
 
         else:
-            _log.info("parsing %s", self.url)
+            with self.session.get(self.url, stream=True) as resp:
+                self._load(resp)
+
+    def update(self) -> bool:
+        """Download and parse the system page again, only if it changed since it was last parsed.
+
+        If only the ETag of the page changed, the new one is kept in .etag (but False is returned).
+
+        Returns:
+            True if the page changed, otherwise False.
+        """
+
+        headers = {"If-None-Match": self.etag} if self.etag else {}
+        with self.session.get(self.url, headers=headers, stream=True) as resp:
+
+            # Some servers ignore If-None-Match and send the page anyway, so compare the ETag too.
+            # The body is streamed, so it isn't downloaded unless it is actually parsed.
+            if resp.status_code == 304 or (
+                self.etag is not None and resp.headers.get("ETag") == self.etag
+            ):
+                _log.info("%s not modified", self.url)
+                return False
+
+            # don't mistake an error page (i.e a 503 still failing after retries) for a changed page.
+            resp.raise_for_status()
 
-            resp = self.session.get(self.url)
-            soup = _resp2soup(resp)
+            # the ETag can change without the page changing (i.e behind some proxies),
+            # so don't parse the page again unless its content did.
+            # (to compare it, the page is read into memory first; _load() then parses it from there.)
+            if (
+                self.content_hash is not None
+                and _hash(resp.content) == self.content_hash
+            ):
+                _log.info("%s not modified (new etag)", self.url)
+                self.etag = resp.headers.get("ETag")
+                return False
 
-            self.version = soup.address.text.strip().split()[-1].rstrip(".")
+            self._load(resp)
 
-            self._parse(soup.table)
-            _log.info("ok (total %s games, %s songs)", len(self), self.total_songs())
+        return True
 
     def cache(self) -> dict:
         """Serialise all songs to a dictionary format that can be saved on disk and subsequently loaded.
@@ -174,18 +679,23 @@ class System(c_abc.Mapping):
             The serialised songs.
         """
 
-        cache: Dict[str, Any] = {"url": self.url, "version": self.version, "games": {}}
+        cache: Dict[str, Any] = {
+            "url": self.url,
+            "version": self.version,
+            "etag": self.etag,
+            "content_hash": self.content_hash,
+            "games": {},
+        }
 
         for game, songs in self.games.items():
-            serialised = [song.cache() for song in songs]
-            cache["games"][game] = serialised
+            cache["games"][game] = songs.cache()
 
         return cache
 
     def total_songs(self) -> int:
         """Return the total number of songs."""
 
-        return sum(len(game) for game in self)
+        return sum(len(songs) for songs in self.games.values())
 
     def __getitem__(self, game):
         return self.games[game]
@@ -196,42 +706,187 @@ class System(c_abc.Mapping):
     def __iter__(self):
         return iter(self.games)
 
-    def _parse(self, table):
+    # the Mapping mixins would go through __getitem__ for every game, so use the dict's own methods.
+    def __contains__(self, game):
+        return game in self.games
+
+    def keys(self):
+        return self.games.keys()
+
+    def items(self):
+        return self.games.items()
 
-        rows = table.find_all("tr")
+    def values(self):
+        return self.games.values()
 
-        # first two rows are header info, ignore
-        rows = rows[2:]
+    def _load(self, resp):
+        resp.raise_for_status()
 
+        _log.info("parsing %s", self.url)
+
+        if self.parser == "lxml":
+            # the page is hashed while it is streamed to lxml.
+            parsed = []
+            games = self._parse(self._stream_rows(resp, parsed))
+            ((tree, content_hash),) = parsed
+        else:
+            # html5lib parses the whole page from memory anyway.
+            content_hash = _hash(resp.content)
+            tree = _resp2tree(resp, self.parser)
+            games = self._parse(_table_rows(tree))
+
+        version = _parse_version(tree)
+
+        # only replace anything once the whole page was parsed,
+        # so a page that fails to parse leaves the system as it was.
+        self.games = games
+        self.version = version
+        self.etag = resp.headers.get("ETag")
+        self.content_hash = content_hash
+
+        _log.info("ok (total %s games, %s songs)", len(self), self.total_songs())
+
+    def _stream_rows(self, resp, parsed):
+        # Like _table_rows(), but rows are yielded while lxml is still being fed the page,
+        # and each one is thrown away once it has been parsed,
+        # so the tree of a large system page never has all of its rows at once.
+        # The rest of the tree and the hash of the page are appended to parsed once the whole page was fed.
+        html_parser = etree.HTMLPullParser(
+            events=("end",), tag=("table", "tr"), encoding=resp.encoding or "utf-8"
+        )
+
+        table = None
+        count = 0
+
+        def rows(events):
+            nonlocal table, count
+
+            for _, row in events:
+                if row.tag == "table":
+                    # the first table may have ended without any rows.
+                    if table is None:
+                        table = row
+                    continue
+
+                if table is None:
+                    table = next(row.iterancestors("table"), None)
+
+                # html5lib wraps the rows in a tbody, lxml doesn't.
+                parent = row.getparent()
+                if parent is not table and parent.getparent() is not table:
+                    # a row from another table
+                    continue
+
+                # first two rows are header info, ignore
+                count += 1
+                if count > 2:
+                    yield row
+
+                row.clear()
+                while row.getprevious() is not None:
+                    del parent[0]
+
+        content_hash = _new_hash()
+
+        for chunk in resp.iter_content(chunk_size=64 * 1024):
+            content_hash.update(chunk)
+            html_parser.feed(chunk)
+            yield from rows(html_parser.read_events())
+
+        tree = html_parser.close()
+        yield from rows(html_parser.read_events())
+
+        # same as _table_rows(), so error pages and the like aren't taken for empty systems.
+        if table is None:
+            raise ValueError("no song table in page")
+
+        parsed.append((tree, content_hash.hexdigest()))
+
+    def _parse(self, rows):
+        games: Dict[str, SongList] = {}
         game_title = None
+        # the songs of the current title (rows are grouped by title),
+        # so each row doesn't have to look the title up again.
+        songs = None
+        join = _url_joiner(self.url)
 
         for row in rows:
 
-            if _is_header(row):
+            if row.get("class", "").partition(" ")[0] == "header":
                 # new title
-                game_title = row.text.strip()
+                game_title = XPATH_TEXT(row).strip()
+                songs = None
                 continue
 
-            elif _is_empty(row):
+            cells = row.findall("td")
+            # a song always has a title, so only rows without one have to be checked for padding
+            # (instead of getting the text of every row on top of the text of its cells).
+            title = XPATH_TEXT(cells[0]).strip() if cells else ""
+
+            if not title and _is_empty(row):
                 # visual padding, ignore
                 continue
 
-            song = self._parse_row(row)
-            self.games[game_title].append(song)
+            if songs is None:
+                songs = games.setdefault(game_title, SongList())
 
-    def _parse_row(self, row):
+            songs.append(self._parse_row(cells, title, join))
 
-        _title, _size, _author, _info = row.find_all("td")
+        return games
 
-        url = urljoin(self.url, _title.a["href"])
-        title = _title.text.strip()
-        size = int(_size.text.split()[0])
-        author = _author.text.strip()
-        md5 = _md5_from_url(_info.a["href"])
+    def _parse_row(self, cells, title, join):
+
+        _title, _size, _author, _info = cells
+
+        url = join(XPATH_HREF(_title))
+        size = int(XPATH_TEXT(_size).split()[0])
+        # most authors have sequenced many songs, so share one copy of each name.
+        author = sys.intern(XPATH_TEXT(_author).strip())
+        md5 = _md5_from_url(XPATH_HREF(_info))
 
         return Song(url, title, size, author, md5)
 
 
+class _SongIndex:
+    # All cached songs flattened once, so searching doesn't walk through every system and game each time.
+    # It is never changed once built (a new one is built instead), so a search can use it from start to end
+    # while systems are being cached by other threads.
+    def __init__(self, systems):
+        # (system_name, game_name, song) for every song.
+        self.entries = [
+            (system_name, game_name, song)
+            for system_name, system in list(systems.items())
+            for game_name, game in system.games.items()
+            for song in game
+        ]
+        self.songs = [song for _, _, song in self.entries]
+        self.systems = {system_name for system_name, _, _ in self.entries}
+
+        # (system_name, game_name, start, stop) for each game,
+        # where start:stop is the slice of the index its songs are in.
+        self.games = []
+        start = 0
+        for (system_name, game_name), songs in itertools.groupby(
+            self.entries, key=operator.itemgetter(0, 1)
+        ):
+            stop = start + sum(1 for _ in songs)
+            self.games.append((system_name, game_name, start, stop))
+            start = stop
+
+        self._columns: Dict[str, List[str]] = {}
+
+    def column(self, field):
+        # One song field of every song as a list of strings (they are matched as such),
+        # so a regex can be run over it in one go.
+        column = self._columns.get(field)
+
+        if column is None:
+            get = operator.attrgetter(field)
+            column = self._columns[field] = [str(get(song)) for song in self.songs]
+
+        return column
+
+
 class API(c_abc.Mapping):
     """
     Public api to VGMusic.
@@ -239,36 +894,60 @@ class API(c_abc.Mapping):
     Args:
         cache: The previously serialised dict from .cache().
             If not specified, defaults to None.
+        parser: The parser used to build page trees ('lxml' or 'html5lib').
+            Use 'html5lib' if lxml fails to parse them properly (needs the html5 extra);
+            html5-parser is used instead of plain html5lib, if it is installed.
+            If not specified, defaults to HTML_PARSER ('lxml').
 
     Attributes:
         session: The requests session used to download pages/songs.
         systems: A map of system names to System objects.
+        parser: See args.
+        modified: Whether or not anything was downloaded since the api was created
+            (if not, there is no need to save the cache again).
     """
 
-    def __init__(self, cache: Optional[dict] = None):
-        self.session = requests.Session()
+    def __init__(self, cache: Optional[dict] = None, parser: str = HTML_PARSER):
+        self.session = _new_session()
+        self._pool = c_futures.ThreadPoolExecutor(max_workers=MAX_CONNECTIONS)
+        self.parser = parser
         self.systems: Dict[str, System] = {}
 
         self._urls = {}
+        self.modified = not cache
+        # all cached songs, built on the first search.
+        self._index: Optional[_SongIndex] = None
 
         if cache:
             self._urls = cache["urls"]
             for name, system_info in cache["systems"].items():
-                self.systems[name] = System("", cache=system_info, session=self.session)
+                # caches from older versions have a list of song dicts for each game,
+                # so save them again as columns.
+                if any(type(songs) is list for songs in system_info["games"].values()):
+                    self.modified = True
+
+                self.systems[name] = System(
+                    "", cache=system_info, session=self.session, parser=self.parser
+                )
 
         else:
-            soup = _resp2soup(self.session.get(VGMUSIC_URL))
-            sections = soup.find_all("p", class_="menu")[1:]
+            with self.session.get(VGMUSIC_URL, stream=True) as resp:
+                tree = _resp2tree(resp, self.parser)
+
+            sections = XPATH_MENUS(tree)[1:]
 
             for section in sections:
-                for system in section.find_all("a"):
+                for system in XPATH_LINKS(section):
 
-                    url = urljoin(VGMUSIC_URL, system["href"])
-                    name = system.text
+                    url = urljoin(VGMUSIC_URL, system.get("href"))
+                    name = XPATH_TEXT(system)
 
                     _log.info("adding %s (%s)", name, url)
                     self._urls[name] = url
 
+        # stop concurrent lookups from downloading the same system page twice.
+        self._locks = {name: threading.Lock() for name in self._urls}
+
     def search(self, criteria: Callable[[str, str, Song], bool]) -> List[Song]:
         """Search for songs using criteria.
 
@@ -279,15 +958,18 @@ class API(c_abc.Mapping):
             Songs that match the criteria.
         """
 
-        songs = []
+        return [
+            song
+            for system_name, game_name, song in self._song_index().entries
+            if criteria(system_name, game_name, song)
+        ]
 
-        for system_name, system in self.systems.items():
-            for game_name, game in system.games.items():
-                for song in game:
-                    if criteria(system_name, game_name, song):
-                        songs.append(song)
+    def iter_search(self, criteria: Callable[[str, str, Song], bool]) -> Iterator[Song]:
+        """Like .search(), but songs are yielded as they are found instead of returned as a list."""
 
-        return songs
+        for system_name, game_name, song in self._song_index().entries:
+            if criteria(system_name, game_name, song):
+                yield song
 
     def search_by_regex(self, **regexes) -> List[Song]:
         """Search for songs using regex as criteria.
@@ -298,27 +980,85 @@ class API(c_abc.Mapping):
         Args:
             regexes: The regexes to use as criteria.
             'system' and 'game' match the system name and game name; anything else matches to fields in the song.
+            Empty regexes (and ones like '.*') match anything.
 
         Returns:
             Songs matching the regexes.
+
+        Raises:
+            ValueError, if a regex is for a field songs don't have.
         """
 
-        re_system = re.compile(regexes.pop("system", None) or "")
-        re_game = re.compile(regexes.pop("game", None) or "")
+        return list(self.iter_search_by_regex(**regexes))
 
-        def criteria(system, game, song):
-            nonlocal re_system
-            nonlocal re_game
+    def iter_search_by_regex(self, **regexes) -> Iterator[Song]:
+        """Like .search_by_regex(), but songs are yielded as they are found instead of returned as a list."""
 
-            fields = song.cache()
+        # the same index for the whole search, even if a system is (re)parsed by another thread meanwhile.
+        index = self._song_index()
+        songs = index.songs
 
-            field_matches = [
-                re.search(regex, str(fields[field])) for field, regex in regexes.items()
-            ]
+        # the system and game names are the same for all their songs, so check them once.
+        search_system = _compile_or_none(regexes.get("system"))
+        search_game = _compile_or_none(regexes.get("game"))
 
-            return all([re_system.search(system), re_game.search(game), *field_matches])
+        if search_system is None and search_game is None:
+            spans = [(0, len(songs))]
+        else:
+            systems = {
+                name
+                for name in index.systems
+                if search_system is None or search_system(name)
+            }
+            spans = [
+                (start, stop)
+                for system_name, game_name, start, stop in index.games
+                if system_name in systems
+                and (search_game is None or search_game(game_name))
+            ]
 
-        return self.search(criteria)
+        # empty regexes (or ones like '.*') match anything, so they don't need to be searched at all.
+        # (all regexes are compiled once, and their bound search methods looked up once,
+        # instead of in every call to re.search; see _compile_or_none.)
+        checks = [
+            (index.column(field), search) for field, search in _field_searches(regexes)
+        ]
+        # the regex that matches the fewest songs is worth running first, whatever its field.
+        # (sort() is stable, so otherwise the cheapest field still goes first.)
+        # only the songs being searched are sampled, and only if there are enough of them
+        # for the sample to cost a lot less than searching in the wrong order.
+        if len(checks) > 1:
+            total = sum(stop - start for start, stop in spans)
+
+            if total > 8 * _SAMPLE_SIZE:
+                sample = _sample(spans, total)
+                checks.sort(key=lambda check: _sample_matches(check, sample))
+
+        if not checks:
+            for start, stop in spans:
+                yield from songs[start:stop]
+            return
+
+        # the first regex is run over whole slices of its column at once,
+        # the rest only over the songs that matched so far.
+        # (map() and compress() keep the loops over songs in C.)
+        (first_column, first_search), *others = checks
+        indexes = itertools.chain.from_iterable(
+            itertools.compress(
+                range(start, stop), map(first_search, first_column[start:stop])
+            )
+            for start, stop in spans
+        )
+
+        if others:
+            indexes = list(indexes)
+
+            for column, search in others:
+                values = map(column.__getitem__, indexes)
+                indexes = list(itertools.compress(indexes, map(search, values)))
+
+        for i in indexes:
+            yield songs[i]
 
     def download(
         self, songs: List[Song], to: Union[str, pathlib.Path], max_requests: int = 5
@@ -326,35 +1066,27 @@ class API(c_abc.Mapping):
         """Download songs to path.
         Any illegal characters in the song's title are escaped/converted before being used as the filename.
 
-        To download individual songs, use 'Song.download()' instead.
+        To download individual songs, use 'Song.download()' or 'Song.save()' instead.
 
         Args:
             songs: The list of Song objects to download.
             to: The directory to download to.
             max_requests: How many concurrent downloads can happen at the same time.
                 To avoid pinging VGMusic servers too much, it is recommended to set this at 10 or below.
+                Values above MAX_CONNECTIONS have no further effect.
                 If not specified, defaults to 5.
         """
 
         to = pathlib.Path(to)
 
-        with c_futures.ThreadPoolExecutor(max_workers=max_requests) as pool:
-
-            futures = {}
+        def save(song):
+            # songs with the same title are saved to the same file (the last one downloaded is kept).
+            filename = f"{_escape_filename(song.title)}.mid"
+            song.save(to / filename, session=self.session)
 
-            for song in songs:
-
-                future = pool.submit(song.download, session=self.session)
-                filename = f"{_escape_filename(song.title)}.mid"
-
-                futures[future] = filename
-
-            for future in c_futures.as_completed(futures):
-
-                filename = futures[future]
-
-                with (to / filename).open("wb") as f:
-                    f.write(future.result())
+        # consume the results, so any errors are raised here.
+        for _ in self._map(save, songs, max_requests):
+            pass
 
     def cache(self) -> dict:
         """Serialise all systems to a dictionary format that can be saved on disk and subsequently loaded.
@@ -363,22 +1095,102 @@ class API(c_abc.Mapping):
             The serialised systems.
         """
         return {
-            "urls": self._urls,
+            "urls": dict(self._urls),
             "systems": {name: system.cache() for name, system in self.systems.items()},
         }
 
-    def force_cache(self):
-        """Pre-emptively cache all system pages (no further lazy caching is done)."""
-        for system in self._urls:
-            self[system]
+    @classmethod
+    def load_cache(
+        cls, path: Union[str, pathlib.Path], parser: str = HTML_PARSER
+    ) -> "API":
+        """Create an api from a cache file previously saved with .save_cache() (see load_cache()).
+
+        Args:
+            path: The path to the cache file.
+            parser: See the class args.
+
+        Returns:
+            The api.
+
+        Raises:
+            FileNotFoundError, if the cache file does not exist.
+        """
+        return cls(cache=load_cache(path), parser=parser)
+
+    def save_cache(self, path: Union[str, pathlib.Path], indent: bool = True):
+        """Save all systems to a cache file (see save_cache()).
+
+        Args:
+            path: The path to the cache file.
+            indent: Whether or not to indent the cache (by two spaces) to make it human-readable.
+                If not specified, defaults to True.
+        """
+        save_cache(self.cache(), path, indent=indent)
+
+    def force_cache(self, max_requests: int = 8):
+        """Pre-emptively cache all system pages (no further lazy caching is done).
+
+        Args:
+            max_requests: How many system pages can be downloaded at the same time.
+                If not specified, defaults to 8.
+        """
+
+        # consume the results, so any errors are raised here.
+        for _ in self._map(self.__getitem__, self._urls, max_requests):
+            pass
+
+    def available(self) -> List[str]:
+        """Get the names of all systems on VGMusic, cached or not.
+        Any of them can be looked up (which caches it if it isn't already).
+
+        Returns:
+            The system names.
+        """
+
+        return list(self._urls)
+
+    def update(self, max_requests: int = 8) -> List[str]:
+        """Update all cached system pages that changed on VGMusic since they were last parsed.
+
+        Args:
+            max_requests: How many system pages can be checked at the same time.
+                If not specified, defaults to 8.
+
+        Returns:
+            The names of the systems that were updated.
+        """
+
+        systems = list(self.systems)
+
+        def update(name):
+            system = self.systems[name]
+            etag = system.etag
+            updated = system.update()
+            # done as soon as each system is updated, so a later one failing doesn't lose the change.
+            if updated:
+                self._changed()
+            elif system.etag != etag:
+                # the songs are the same, but the new ETag still has to be saved,
+                # or every update would download the page again.
+                self.modified = True
+
+            return updated
+
+        changed = self._map(update, systems, max_requests)
+
+        return [name for name, updated in zip(systems, changed) if updated]
 
     def close(self):
+        self._pool.shutdown()
         self.session.close()
 
     def __getitem__(self, system):
         if system not in self.systems:
-            _log.info("downloading page for %s", system)
-            self._force_cache(system)
+            with self._locks[system]:
+                # the page may have been cached while waiting for the lock.
+                if system not in self.systems:
+                    _log.info("downloading page for %s", system)
+                    self._force_cache(system)
 
         return self.systems[system]
 
@@ -388,11 +1200,56 @@ class API(c_abc.Mapping):
     def __iter__(self):
         return iter(self.systems)
 
+    # like keys() and len(), only the cached systems count (see .available() for all of them).
+    # this also means checking for a system doesn't download its page like Mapping.__contains__ would.
+    def __contains__(self, system):
+        return system in self.systems
+
+    def keys(self):
+        return self.systems.keys()
+
+    def items(self):
+        return self.systems.items()
+
+    def values(self):
+        return self.systems.values()
+
     def __enter__(self):
         return self
 
     def __exit__(self, t, v, tb):
         self.close()
 
+    def _map(self, func, items, max_requests):
+        # Like pool.map(), but at most max_requests calls are running at the same time.
+        # The pool is shared between all requests made by the api, so its threads can be reused.
+        futures = collections.deque()
+
+        for item in items:
+            if len(futures) >= max_requests:
+                yield futures.popleft().result()
+
+            futures.append(self._pool.submit(func, item))
+
+        while futures:
+            yield futures.popleft().result()
+
     def _force_cache(self, system):
-        self.systems[system] = System(self._urls[system], session=self.session)
+        self.systems[system] = System(
+            self._urls[system], session=self.session, parser=self.parser
+        )
+        self._changed()
+
+    def _changed(self):
+        # a system page was (re)parsed: the cache has to be saved, and searches need a new index.
+        self.modified = True
+        self._index = None
+
+    def _song_index(self):
+        # The index is thrown away whenever a system page is (re)parsed.
+        index = self._index
+
+        if index is None:
+            index = self._index = _SongIndex(self.systems)
+
+        return index